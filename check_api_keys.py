@@ -3,8 +3,7 @@
 Check API key configuration for Mapbox and ORS.
 """
 
-import os
-from pathlib import Path
+from trips.env import get_api_key
 
 def check_api_keys():
     """Check which API keys are configured."""
@@ -12,37 +11,27 @@ def check_api_keys():
     print("🔑 API Key Configuration Check")
     print("=" * 40)
     
-    # Check for .env file
-    env_file = Path('.env')
-    if env_file.exists():
-        print("✅ .env file found")
-        
-        # Read .env file
-        with open(env_file, 'r') as f:
+    # Check for .env file (open directly instead of a separate exists() check)
+    try:
+        with open('.env', 'r') as f:
             env_content = f.read()
-            
-        # Check for Mapbox token
-        mapbox_found = 'MAPBOX_ACCESS_TOKEN=' in env_content
-        print(f"   Mapbox Token: {'✅ Found' if mapbox_found else '❌ Not found'}")
+    except FileNotFoundError:
+        env_content = None
+    
+    if env_content is not None:
+        print("✅ .env file found")
         
-        # Check for ORS token
-        ors_found = 'ORS_API_KEY=' in env_content
-        print(f"   ORS Token: {'✅ Found' if ors_found else '❌ Not found'}")
+        # Parse KEY=value lines in a single pass
+        env_map = {key: value for key, _, value in
+                   (line.partition('=') for line in env_content.splitlines()) if key}
         
-        # Show token values (masked)
-        for line in env_content.split('\n'):
-            if line.startswith('MAPBOX_ACCESS_TOKEN='):
-                token = line.split('=')[1]
-                if token:
-                    print(f"   Mapbox Token: {token[:10]}...")
-                else:
-                    print(f"   Mapbox Token: (empty)")
-            elif line.startswith('ORS_API_KEY='):
-                token = line.split('=')[1]
-                if token:
-                    print(f"   ORS Token: {token[:10]}...")
-                else:
-                    print(f"   ORS Token: (empty)")
+        for key, label in (('MAPBOX_ACCESS_TOKEN', 'Mapbox'), ('ORS_API_KEY', 'ORS')):
+            token = env_map.get(key)
+            print(f"   {label} Token: {'✅ Found' if token is not None else '❌ Not found'}")
+            if token:
+                print(f"   {label} Token: {token[:10]}...")
+            elif token is not None:
+                print(f"   {label} Token: (empty)")
     else:
         print("❌ .env file not found")
         print("   Create a .env file with your API keys")
@@ -51,8 +40,8 @@ def check_api_keys():
     
     # Check environment variables
     print("🌍 Environment Variables:")
-    mapbox_env = os.getenv('MAPBOX_ACCESS_TOKEN')
-    ors_env = os.getenv('ORS_API_KEY')
+    mapbox_env = get_api_key('MAPBOX_ACCESS_TOKEN')
+    ors_env = get_api_key('ORS_API_KEY')
     
     print(f"   MAPBOX_ACCESS_TOKEN: {'✅ Set' if mapbox_env else '❌ Not set'}")
     print(f"   ORS_API_KEY: {'✅ Set' if ors_env else '❌ Not set'}")
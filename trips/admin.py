@@ -13,7 +13,12 @@ class DriverAdmin(admin.ModelAdmin):
 @admin.register(DailyRod)
 class DailyRodAdmin(admin.ModelAdmin):
     list_display = ['driver', 'date', 'driving_hours', 'on_duty_hours', 'off_duty_hours']
-    list_filter = ['date', 'driver']
+    list_filter = ['date', ('driver', admin.RelatedOnlyFieldListFilter)]
     search_fields = ['driver__name']
     ordering = ['-date', 'driver']
     date_hierarchy = 'date'
+
+    def get_queryset(self, request):
+        # The change list already joins driver (it is in list_display); this covers
+        # the object and delete pages, which render DailyRod.__str__
+        return super().get_queryset(request).select_related('driver')
@@ -0,0 +1,18 @@
+"""
+Cached access to API keys read from the process environment.
+"""
+import os
+from functools import lru_cache
+from typing import Optional
+
+
+@lru_cache(maxsize=None)
+def get_api_key(name: str) -> Optional[str]:
+    """
+    Return an API key from the environment, reading it only once per process.
+    
+    Keys don't change while the process runs, so repeated lookups are served
+    from the cache. Inside Django prefer the values on settings, which are
+    loaded once at startup.
+    """
+    return os.environ.get(name)
@@ -1,10 +1,74 @@
 """
 Hours of Service (HOS) scheduler implementing FMCSA regulations.
 """
+import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 from dateutil import tz
 
+logger = logging.getLogger(__name__)
+
+# Durations used on every call, built once at import time
+_ONE_DAY = timedelta(days=1)
+_ONE_HOUR = timedelta(hours=1)
+_RESTART_34H = timedelta(hours=34)
+_REST_10H = timedelta(hours=10)
+_BREAK_30M = timedelta(minutes=30)
+_SECONDS_PER_HOUR = 3600.0
+
+# Hours added to (daily driving, daily on-duty, daily off-duty, consecutive driving)
+# per logged hour of each duty status; None means the status resets consecutive driving
+_STATUS_WEIGHTS = {
+    'driving': (1.0, 1.0, 0.0, 1.0),  # Driving time counts as on-duty time
+    'on_duty': (0.0, 1.0, 0.0, 0.0),
+    'off_duty': (0.0, 0.0, 1.0, None),
+}
+
+
+def _hhmm(moment: datetime) -> str:
+    """Format a datetime as HH:MM without going through strftime."""
+    return f"{moment.hour:02d}:{moment.minute:02d}"
+
+
+def empty_entry_columns() -> Dict[str, List]:
+    """Create empty per-day entry columns (one list per entry field)."""
+    return {'start': [], 'end': [], 'status': [], 'location': [], 'duration': []}
+
+
+def _append_entry(cols: Dict[str, List], start: str, end: str, status: str,
+                  location: str, duration: float) -> None:
+    """Append a single duty status entry to the day's columns."""
+    cols['start'].append(start)
+    cols['end'].append(end)
+    cols['status'].append(status)
+    cols['location'].append(location)
+    cols['duration'].append(duration)
+
+
+def entries_from_columns(cols: Dict[str, List]) -> List[Dict]:
+    """Materialize a day's entry columns into the list-of-entries API format."""
+    return [
+        {
+            'start_time': start,
+            'end_time': end,
+            'status': status,
+            'location': location,
+            'duration': duration
+        }
+        for start, end, status, location, duration in zip(
+            cols['start'], cols['end'], cols['status'], cols['location'], cols['duration']
+        )
+    ]
+
+
+def columns_from_entries(entries: List[Dict]) -> Dict[str, List]:
+    """Convert a list of entries into the columnar form used for storage."""
+    cols = empty_entry_columns()
+    for entry in entries:
+        _append_entry(cols, entry['start_time'], entry['end_time'], entry['status'],
+                      entry['location'], entry['duration'])
+    return cols
+
 
 def hos_scheduler(start_time: datetime, segments: List[Dict], weekly_used: float = 0.0) -> List[Dict]:
     """
@@ -19,11 +83,29 @@ def hos_scheduler(start_time: datetime, segments: List[Dict], weekly_used: float
     Returns:
         List of daily logs with entries and totals for each day
     """
+    return list(hos_scheduler_iter(start_time, segments, weekly_used))
+
+
+def hos_scheduler_iter(start_time: datetime, segments: List[Dict],
+                       weekly_used: float = 0.0) -> Iterator[Dict]:
+    """
+    Generator form of hos_scheduler that yields each daily log once the day is complete.
+    
+    Args:
+        start_time: When the trip starts
+        segments: List of segments with 'type', 'duration', 'location'
+        weekly_used: Hours already used in current 8-day cycle
+    
+    Yields:
+        Daily logs with entries and totals, in date order
+    """
     # Start the day at midnight of the start date
     day_start = start_time.replace(hour=0, minute=0, second=0, microsecond=0)
+    day_end = day_start + _ONE_DAY  # Only changes when a new day starts
     current_time = start_time
-    daily_logs = []
-    daily_entries = []
+    current_hhmm = _hhmm(current_time)  # HH:MM of current_time, reused as the next entry's start
+    finished_days = []  # Days completed while processing the current segment
+    daily_cols = empty_entry_columns()
     
     # HOS tracking variables
     daily_driving = 0.0
@@ -32,31 +114,110 @@ def hos_scheduler(start_time: datetime, segments: List[Dict], weekly_used: float
     weekly_hours = weekly_used
     consecutive_driving = 0.0
     
+    # Running totals for the debug summary
+    days_logged = 0
+    trip_driving = 0.0
+    trip_on_duty = 0.0
+    trip_off_duty = 0.0
+    
+    def _day_log():
+        """Build the log for the current day in the row-based API format."""
+        nonlocal days_logged, trip_driving, trip_on_duty, trip_off_duty
+        days_logged += 1
+        trip_driving += daily_driving
+        trip_on_duty += daily_on_duty
+        trip_off_duty += daily_off_duty
+        return {
+            'date': day_start.date().isoformat(),
+            'entries': entries_from_columns(daily_cols),
+            'totals': {
+                'driving_hours': daily_driving,
+                'on_duty_hours': daily_on_duty,
+                'off_duty_hours': daily_off_duty
+            }
+        }
+    
+    def _roll_day():
+        """Save the current day and start a new one at current_time's midnight."""
+        nonlocal day_start, day_end, daily_cols, daily_driving, daily_on_duty, daily_off_duty
+        
+        logger.debug("Crossing midnight: %s -> %s (driving=%.1f, on_duty=%.1f, off_duty=%.1f)",
+                     day_start, current_time, daily_driving, daily_on_duty, daily_off_duty)
+        
+        # Save current day
+        finished_days.append(_day_log())
+        
+        # Start new day
+        day_start = current_time.replace(hour=0, minute=0, second=0, microsecond=0)
+        day_end = day_start + _ONE_DAY
+        daily_cols = empty_entry_columns()
+        daily_driving = 0.0
+        daily_on_duty = 0.0
+        daily_off_duty = 0.0
+        
+        # Add off-duty period from midnight to current time
+        if current_time > day_start:
+            off_duty_duration = (current_time - day_start).total_seconds() / _SECONDS_PER_HOUR
+            _append_entry(daily_cols, '00:00', current_hhmm,
+                          'off_duty', 'Off Duty', off_duty_duration)
+            daily_off_duty += off_duty_duration
+            logger.debug("Added off-duty period: %.1f hours", off_duty_duration)
+    
+    def _add_break(break_delta, location):
+        """Insert an off-duty break of break_delta starting at current_time."""
+        nonlocal current_time, current_hhmm, daily_off_duty
+        break_duration = break_delta / _ONE_HOUR
+        end_time = current_time + break_delta
+        end_hhmm = _hhmm(end_time)
+        _append_entry(daily_cols, current_hhmm, end_hhmm,
+                      'off_duty', location, break_duration)
+        daily_off_duty += break_duration
+        current_time = end_time
+        current_hhmm = end_hhmm
+    
+    def _emit_segment(status, duration, location):
+        """Log a duty status segment, splitting it at each midnight it spans."""
+        nonlocal current_time, current_hhmm, daily_driving, daily_on_duty, daily_off_duty, consecutive_driving
+        driving_weight, on_duty_weight, off_duty_weight, consecutive_weight = _STATUS_WEIGHTS[status]
+        remaining_duration = duration
+        while remaining_duration > 0:
+            if current_time >= day_end:
+                _roll_day()
+            
+            # Use the smaller of remaining duration or time left in day
+            time_left_in_day = (day_end - current_time).total_seconds() / _SECONDS_PER_HOUR
+            segment_duration = min(remaining_duration, time_left_in_day)
+            
+            end_time = current_time + timedelta(hours=segment_duration)
+            end_hhmm = _hhmm(end_time)
+            _append_entry(daily_cols, current_hhmm, end_hhmm,
+                          status, location, segment_duration)
+            daily_driving += driving_weight * segment_duration
+            daily_on_duty += on_duty_weight * segment_duration
+            daily_off_duty += off_duty_weight * segment_duration
+            if consecutive_weight is None:
+                consecutive_driving = 0.0
+            else:
+                consecutive_driving += consecutive_weight * segment_duration
+            current_time = end_time
+            current_hhmm = end_hhmm
+            remaining_duration -= segment_duration
+            
+            # If we've used all time in the day, the midnight crossing logic will handle the next day
+            if remaining_duration > 0:
+                logger.debug("%s segment spans midnight, %.1f hours remaining", status, remaining_duration)
+    
     # Add initial off-duty period from midnight to start time
     if start_time > day_start:
-        off_duty_duration = (start_time - day_start).total_seconds() / 3600
-        daily_entries.append({
-            'start_time': '00:00',
-            'end_time': start_time.strftime('%H:%M'),
-            'status': 'off_duty',
-            'location': 'Off Duty',
-            'duration': off_duty_duration
-        })
+        off_duty_duration = (start_time - day_start).total_seconds() / _SECONDS_PER_HOUR
+        _append_entry(daily_cols, '00:00', current_hhmm,
+                      'off_duty', 'Off Duty', off_duty_duration)
         daily_off_duty += off_duty_duration
     
     # Check 70-hour rule before starting trip
     if weekly_hours > 70.0:
         # Need 34-hour restart before starting
-        restart_duration = 34.0
-        daily_entries.append({
-            'start_time': current_time.strftime('%H:%M'),
-            'end_time': (current_time + timedelta(hours=restart_duration)).strftime('%H:%M'),
-            'status': 'off_duty',
-            'location': '34-hour Restart',
-            'duration': restart_duration
-        })
-        daily_off_duty += restart_duration
-        current_time += timedelta(hours=restart_duration)
+        _add_break(_RESTART_34H, '34-hour Restart')
         weekly_hours = 0.0  # Reset weekly hours
 
     # Process each segment
@@ -66,326 +227,64 @@ def hos_scheduler(start_time: datetime, segments: List[Dict], weekly_used: float
         location = segment.get('location', '')
         
         # Check if we need to start a new day (cross midnight)
-        if current_time.date() != day_start.date():
-            print(f"🌅 Crossing midnight: {day_start.date()} -> {current_time.date()}")
-            print(f"   Day totals before save: Driving={daily_driving:.1f}, On Duty={daily_on_duty:.1f}, Off Duty={daily_off_duty:.1f}")
-            
-            # Save current day
-            daily_logs.append({
-                'date': day_start.date().isoformat(),
-                'entries': daily_entries.copy(),
-                'totals': {
-                    'driving_hours': daily_driving,
-                    'on_duty_hours': daily_on_duty,
-                    'off_duty_hours': daily_off_duty
-                }
-            })
-            
-            # Start new day
-            day_start = current_time.replace(hour=0, minute=0, second=0, microsecond=0)
-            daily_entries = []
-            daily_driving = 0.0
-            daily_on_duty = 0.0
-            daily_off_duty = 0.0
-            
-            # Add off-duty period from midnight to current time
-            if current_time > day_start:
-                off_duty_duration = (current_time - day_start).total_seconds() / 3600
-                daily_entries.append({
-                    'start_time': '00:00',
-                    'end_time': current_time.strftime('%H:%M'),
-                    'status': 'off_duty',
-                    'location': 'Off Duty',
-                    'duration': off_duty_duration
-                })
-                daily_off_duty += off_duty_duration
-                print(f"   Added off-duty period: {off_duty_duration:.1f} hours")
+        if current_time >= day_end:
+            _roll_day()
         
         # Process segment based on type
         if segment_type == 'drive':
-            print(f"🚛 Processing drive segment: {duration} hours, current daily driving: {daily_driving}")
+            logger.debug("Processing drive segment: %s hours, current daily driving: %s", duration, daily_driving)
             
             # Check 11-hour driving limit
             if daily_driving + duration > 11.0:
                 # Need to insert 10-hour break
-                break_duration = 10.0
-                daily_entries.append({
-                    'start_time': current_time.strftime('%H:%M'),
-                    'end_time': (current_time + timedelta(hours=break_duration)).strftime('%H:%M'),
-                    'status': 'off_duty',
-                    'location': 'Rest Break (10 hours)',
-                    'duration': break_duration
-                })
-                daily_off_duty += break_duration
-                current_time += timedelta(hours=break_duration)
+                _add_break(_REST_10H, 'Rest Break (10 hours)')
                 daily_driving = 0.0  # Reset after 10-hour break
                 consecutive_driving = 0.0
             
             # Check 8-hour consecutive driving limit (need 30-min break)
             if consecutive_driving + duration > 8.0:
                 # Insert 30-minute break
-                break_duration = 0.5
-                daily_entries.append({
-                    'start_time': current_time.strftime('%H:%M'),
-                    'end_time': (current_time + timedelta(hours=break_duration)).strftime('%H:%M'),
-                    'status': 'off_duty',
-                    'location': '30-min Break',
-                    'duration': break_duration
-                })
-                daily_off_duty += break_duration
-                current_time += timedelta(hours=break_duration)
+                _add_break(_BREAK_30M, '30-min Break')
                 consecutive_driving = 0.0
             
-            # Handle segment that might span across midnight
-            remaining_duration = duration
-            while remaining_duration > 0:
-                # Check if we need to start a new day (cross midnight) - handle within segment processing
-                if current_time.date() != day_start.date():
-                    print(f"🌅 Crossing midnight during segment: {day_start.date()} -> {current_time.date()}")
-                    print(f"   Day totals before save: Driving={daily_driving:.1f}, On Duty={daily_on_duty:.1f}, Off Duty={daily_off_duty:.1f}")
-                    
-                    # Save current day
-                    daily_logs.append({
-                        'date': day_start.date().isoformat(),
-                        'entries': daily_entries.copy(),
-                        'totals': {
-                            'driving_hours': daily_driving,
-                            'on_duty_hours': daily_on_duty,
-                            'off_duty_hours': daily_off_duty
-                        }
-                    })
-                    
-                    # Start new day
-                    day_start = current_time.replace(hour=0, minute=0, second=0, microsecond=0)
-                    daily_entries = []
-                    daily_driving = 0.0
-                    daily_on_duty = 0.0
-                    daily_off_duty = 0.0
-                    
-                    # Add off-duty period from midnight to current time
-                    if current_time > day_start:
-                        off_duty_duration = (current_time - day_start).total_seconds() / 3600
-                        daily_entries.append({
-                            'start_time': '00:00',
-                            'end_time': current_time.strftime('%H:%M'),
-                            'status': 'off_duty',
-                            'location': 'Off Duty',
-                            'duration': off_duty_duration
-                        })
-                        daily_off_duty += off_duty_duration
-                        print(f"   Added off-duty period: {off_duty_duration:.1f} hours")
-                
-                # Calculate how much time is left in current day
-                day_end = day_start + timedelta(days=1)
-                time_left_in_day = (day_end - current_time).total_seconds() / 3600
-                
-                # Use the smaller of remaining duration or time left in day
-                segment_duration = min(remaining_duration, time_left_in_day)
-                
-                # Add driving segment
-                daily_entries.append({
-                    'start_time': current_time.strftime('%H:%M'),
-                    'end_time': (current_time + timedelta(hours=segment_duration)).strftime('%H:%M'),
-                    'status': 'driving',
-                    'location': location,
-                    'duration': segment_duration
-                })
-                daily_driving += segment_duration
-                daily_on_duty += segment_duration  # Driving time counts as on-duty time
-                consecutive_driving += segment_duration
-                current_time += timedelta(hours=segment_duration)
-                remaining_duration -= segment_duration
-                
-                # If we've used all time in the day, the midnight crossing logic will handle the next day
-                if remaining_duration > 0:
-                    print(f"   Segment spans midnight, {remaining_duration:.1f} hours remaining")
+            _emit_segment('driving', duration, location)
             
         elif segment_type == 'on_duty':
             # Check 14-hour on-duty window
             if daily_on_duty + duration > 14.0:
                 # Need to insert 10-hour break
-                break_duration = 10.0
-                daily_entries.append({
-                    'start_time': current_time.strftime('%H:%M'),
-                    'end_time': (current_time + timedelta(hours=break_duration)).strftime('%H:%M'),
-                    'status': 'off_duty',
-                    'location': '14-hour Reset',
-                    'duration': break_duration
-                })
-                daily_off_duty += break_duration
-                current_time += timedelta(hours=break_duration)
+                _add_break(_REST_10H, '14-hour Reset')
                 daily_on_duty = 0.0  # Reset after 10-hour break
             
-            # Handle segment that might span across midnight
-            remaining_duration = duration
-            while remaining_duration > 0:
-                # Check if we need to start a new day (cross midnight) - handle within segment processing
-                if current_time.date() != day_start.date():
-                    print(f"🌅 Crossing midnight during on-duty segment: {day_start.date()} -> {current_time.date()}")
-                    print(f"   Day totals before save: Driving={daily_driving:.1f}, On Duty={daily_on_duty:.1f}, Off Duty={daily_off_duty:.1f}")
-                    
-                    # Save current day
-                    daily_logs.append({
-                        'date': day_start.date().isoformat(),
-                        'entries': daily_entries.copy(),
-                        'totals': {
-                            'driving_hours': daily_driving,
-                            'on_duty_hours': daily_on_duty,
-                            'off_duty_hours': daily_off_duty
-                        }
-                    })
-                    
-                    # Start new day
-                    day_start = current_time.replace(hour=0, minute=0, second=0, microsecond=0)
-                    daily_entries = []
-                    daily_driving = 0.0
-                    daily_on_duty = 0.0
-                    daily_off_duty = 0.0
-                    
-                    # Add off-duty period from midnight to current time
-                    if current_time > day_start:
-                        off_duty_duration = (current_time - day_start).total_seconds() / 3600
-                        daily_entries.append({
-                            'start_time': '00:00',
-                            'end_time': current_time.strftime('%H:%M'),
-                            'status': 'off_duty',
-                            'location': 'Off Duty',
-                            'duration': off_duty_duration
-                        })
-                        daily_off_duty += off_duty_duration
-                        print(f"   Added off-duty period: {off_duty_duration:.1f} hours")
-                
-                # Calculate how much time is left in current day
-                day_end = day_start + timedelta(days=1)
-                time_left_in_day = (day_end - current_time).total_seconds() / 3600
-                
-                # Use the smaller of remaining duration or time left in day
-                segment_duration = min(remaining_duration, time_left_in_day)
-                
-                # Add on-duty segment
-                daily_entries.append({
-                    'start_time': current_time.strftime('%H:%M'),
-                    'end_time': (current_time + timedelta(hours=segment_duration)).strftime('%H:%M'),
-                    'status': 'on_duty',
-                    'location': location,
-                    'duration': segment_duration
-                })
-                daily_on_duty += segment_duration
-                current_time += timedelta(hours=segment_duration)
-                remaining_duration -= segment_duration
-                
-                # If we've used all time in the day, the midnight crossing logic will handle the next day
-                if remaining_duration > 0:
-                    print(f"   On-duty segment spans midnight, {remaining_duration:.1f} hours remaining")
+            _emit_segment('on_duty', duration, location)
             
         elif segment_type == 'off_duty':
-            # Handle segment that might span across midnight
-            remaining_duration = duration
-            while remaining_duration > 0:
-                # Check if we need to start a new day (cross midnight) - handle within segment processing
-                if current_time.date() != day_start.date():
-                    print(f"🌅 Crossing midnight during off-duty segment: {day_start.date()} -> {current_time.date()}")
-                    print(f"   Day totals before save: Driving={daily_driving:.1f}, On Duty={daily_on_duty:.1f}, Off Duty={daily_off_duty:.1f}")
-                    
-                    # Save current day
-                    daily_logs.append({
-                        'date': day_start.date().isoformat(),
-                        'entries': daily_entries.copy(),
-                        'totals': {
-                            'driving_hours': daily_driving,
-                            'on_duty_hours': daily_on_duty,
-                            'off_duty_hours': daily_off_duty
-                        }
-                    })
-                    
-                    # Start new day
-                    day_start = current_time.replace(hour=0, minute=0, second=0, microsecond=0)
-                    daily_entries = []
-                    daily_driving = 0.0
-                    daily_on_duty = 0.0
-                    daily_off_duty = 0.0
-                    
-                    # Add off-duty period from midnight to current time
-                    if current_time > day_start:
-                        off_duty_duration = (current_time - day_start).total_seconds() / 3600
-                        daily_entries.append({
-                            'start_time': '00:00',
-                            'end_time': current_time.strftime('%H:%M'),
-                            'status': 'off_duty',
-                            'location': 'Off Duty',
-                            'duration': off_duty_duration
-                        })
-                        daily_off_duty += off_duty_duration
-                        print(f"   Added off-duty period: {off_duty_duration:.1f} hours")
-                
-                # Calculate how much time is left in current day
-                day_end = day_start + timedelta(days=1)
-                time_left_in_day = (day_end - current_time).total_seconds() / 3600
-                
-                # Use the smaller of remaining duration or time left in day
-                segment_duration = min(remaining_duration, time_left_in_day)
-                
-                # Add off-duty segment
-                daily_entries.append({
-                    'start_time': current_time.strftime('%H:%M'),
-                    'end_time': (current_time + timedelta(hours=segment_duration)).strftime('%H:%M'),
-                    'status': 'off_duty',
-                    'location': location,
-                    'duration': segment_duration
-                })
-                daily_off_duty += segment_duration
-                current_time += timedelta(hours=segment_duration)
-                remaining_duration -= segment_duration
-                consecutive_driving = 0.0  # Reset consecutive driving
-                
-                # If we've used all time in the day, the midnight crossing logic will handle the next day
-                if remaining_duration > 0:
-                    print(f"   Off-duty segment spans midnight, {remaining_duration:.1f} hours remaining")
+            _emit_segment('off_duty', duration, location)
+        
+        # Hand off the days this segment completed
+        if finished_days:
+            yield from finished_days
+            finished_days.clear()
     
     # Add final off-duty period to complete the 24-hour day
-    day_end = day_start + timedelta(days=1)
     if current_time < day_end:
-        final_off_duty_duration = (day_end - current_time).total_seconds() / 3600
-        daily_entries.append({
-            'start_time': current_time.strftime('%H:%M'),
-            'end_time': '24:00',  # Use 24:00 to represent end of day
-            'status': 'off_duty',
-            'location': 'Off Duty',
-            'duration': final_off_duty_duration
-        })
+        final_off_duty_duration = (day_end - current_time).total_seconds() / _SECONDS_PER_HOUR
+        _append_entry(daily_cols, current_hhmm, '24:00',  # 24:00 marks end of day
+                      'off_duty', 'Off Duty', final_off_duty_duration)
         daily_off_duty += final_off_duty_duration
     
     # Update weekly hours for next day
     weekly_hours += daily_on_duty
     
     # Save final day
-    daily_logs.append({
-        'date': day_start.date().isoformat(),
-        'entries': daily_entries,
-        'totals': {
-            'driving_hours': daily_driving,
-            'on_duty_hours': daily_on_duty,
-            'off_duty_hours': daily_off_duty
-        }
-    })
-    
-    # Debug: Print calculation summary
-    print(f"📊 Multi-Day HOS Calculation Summary:")
-    print(f"   Total Days: {len(daily_logs)}")
-    print(f"   Final Day Driving: {daily_driving:.1f} hours")
-    print(f"   Final Day On Duty: {daily_on_duty:.1f} hours")
-    print(f"   Final Day Off Duty: {daily_off_duty:.1f} hours")
-    print(f"   Weekly Hours Used: {weekly_hours:.1f} hours")
-    print(f"   Final Day Entries: {len(daily_entries)}")
-    
-    # Calculate totals across all days
-    total_driving = sum(log['totals']['driving_hours'] for log in daily_logs)
-    total_on_duty = sum(log['totals']['on_duty_hours'] for log in daily_logs)
-    total_off_duty = sum(log['totals']['off_duty_hours'] for log in daily_logs)
+    final_log = _day_log()
     
-    print(f"📊 Trip Totals (All Days):")
-    print(f"   Total Driving: {total_driving:.1f} hours")
-    print(f"   Total On Duty: {total_on_duty:.1f} hours")
-    print(f"   Total Off Duty: {total_off_duty:.1f} hours")
+    # Debug: calculation summary
+    logger.debug("Multi-day HOS summary: %d days, final day driving=%.1f, on_duty=%.1f, "
+                 "off_duty=%.1f, entries=%d, weekly hours used=%.1f",
+                 days_logged, daily_driving, daily_on_duty, daily_off_duty,
+                 len(daily_cols['status']), weekly_hours)
+    logger.debug("Trip totals (all days): driving=%.1f, on_duty=%.1f, off_duty=%.1f",
+                 trip_driving, trip_on_duty, trip_off_duty)
     
-    return daily_logs
+    yield final_log
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.6 on 2026-10-15 08:23
+
+import trips.hos
+from django.db import migrations, models
+
+
+# Frozen copies of the conversion helpers, so later changes to trips.hos
+# cannot alter what this migration does.
+ENTRY_FIELDS = (
+    ('start', 'start_time'),
+    ('end', 'end_time'),
+    ('status', 'status'),
+    ('location', 'location'),
+    ('duration', 'duration'),
+)
+
+
+def _columns_from_entries(entries):
+    return {column: [entry[key] for entry in entries] for column, key in ENTRY_FIELDS}
+
+
+def _entries_from_columns(columns):
+    values = [columns[column] for column, _ in ENTRY_FIELDS]
+    return [{key: value for (_, key), value in zip(ENTRY_FIELDS, row)} for row in zip(*values)]
+
+
+def entries_to_columns(apps, schema_editor):
+    DailyRod = apps.get_model('trips', 'DailyRod')
+    for rod in DailyRod.objects.only('id', 'entries').iterator():
+        if isinstance(rod.entries, list):
+            rod.entries = _columns_from_entries(rod.entries)
+            rod.save(update_fields=['entries'])
+
+
+def columns_to_entries(apps, schema_editor):
+    DailyRod = apps.get_model('trips', 'DailyRod')
+    for rod in DailyRod.objects.only('id', 'entries').iterator():
+        if isinstance(rod.entries, dict):
+            rod.entries = _entries_from_columns(rod.entries)
+            rod.save(update_fields=['entries'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dailyrod',
+            name='entries',
+            field=models.JSONField(default=trips.hos.empty_entry_columns, help_text='Duty status entries for the day, stored column-wise (start, end, status, location, duration)'),
+        ),
+        migrations.RunPython(entries_to_columns, columns_to_entries),
+    ]
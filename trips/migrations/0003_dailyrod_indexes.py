@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-15 08:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0002_dailyrod_columnar_entries'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailyrod',
+            index=models.Index(fields=['driver', '-date'], include=('driving_hours', 'on_duty_hours', 'off_duty_hours'), name='dailyrod_totals_covering'),
+        ),
+    ]
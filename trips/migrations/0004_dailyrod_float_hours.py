@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-15 08:24
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0003_dailyrod_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dailyrod',
+            name='driving_hours',
+            field=models.FloatField(default=0.0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(24)]),
+        ),
+        migrations.AlterField(
+            model_name='dailyrod',
+            name='off_duty_hours',
+            field=models.FloatField(default=0.0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(24)]),
+        ),
+        migrations.AlterField(
+            model_name='dailyrod',
+            name='on_duty_hours',
+            field=models.FloatField(default=0.0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(24)]),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from .hos import empty_entry_columns, entries_from_columns, columns_from_entries
 
 
 class Driver(models.Model):
@@ -16,23 +17,65 @@ class Driver(models.Model):
         ordering = ['name']
 
 
+class DailyRodManager(models.Manager):
+    def upsert_logs(self, driver_id, daily_logs, batch_size=500):
+        """
+        Insert or update one DailyRod per daily log from hos_scheduler.
+        
+        Uses a single bulk INSERT ... ON CONFLICT (driver, date) DO UPDATE
+        per batch instead of a query round-trip per day.
+        """
+        rods = [
+            DailyRod(
+                driver_id=driver_id,
+                date=log['date'],
+                driving_hours=log['totals']['driving_hours'],
+                on_duty_hours=log['totals']['on_duty_hours'],
+                off_duty_hours=log['totals']['off_duty_hours'],
+                entries=columns_from_entries(log['entries'])
+            )
+            for log in daily_logs
+        ]
+        return self.bulk_create(
+            rods,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['driver', 'date'],
+            update_fields=['driving_hours', 'on_duty_hours', 'off_duty_hours', 'entries', 'updated_at']
+        )
+
+
 class DailyRod(models.Model):
     """Daily Record of Duty Status (RODS) for HOS compliance."""
     driver = models.ForeignKey(Driver, on_delete=models.CASCADE, related_name='daily_rods')
     date = models.DateField()
-    driving_hours = models.DecimalField(max_digits=4, decimal_places=2, default=0.0,
-                                       validators=[MinValueValidator(0), MaxValueValidator(24)])
-    on_duty_hours = models.DecimalField(max_digits=4, decimal_places=2, default=0.0,
+    driving_hours = models.FloatField(default=0.0,
+                                      validators=[MinValueValidator(0), MaxValueValidator(24)])
+    on_duty_hours = models.FloatField(default=0.0,
+                                      validators=[MinValueValidator(0), MaxValueValidator(24)])
+    off_duty_hours = models.FloatField(default=0.0,
                                        validators=[MinValueValidator(0), MaxValueValidator(24)])
-    off_duty_hours = models.DecimalField(max_digits=4, decimal_places=2, default=0.0,
-                                        validators=[MinValueValidator(0), MaxValueValidator(24)])
-    entries = models.JSONField(default=list, help_text="List of duty status entries for the day")
+    entries = models.JSONField(default=empty_entry_columns,
+                               help_text="Duty status entries for the day, stored column-wise "
+                                         "(start, end, status, location, duration)")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = DailyRodManager()
+
     def __str__(self):
         return f"{self.driver.name} - {self.date}"
 
+    @property
+    def entries_rows(self):
+        """Entries as a list of dicts, the shape returned by the API."""
+        return entries_from_columns(self.entries)
+
     class Meta:
         unique_together = ['driver', 'date']
         ordering = ['-date', 'driver']
+        indexes = [
+            # Lets hour totals per driver be read from the index alone (INCLUDE is Postgres-only)
+            models.Index(fields=['driver', '-date'], name='dailyrod_totals_covering',
+                         include=['driving_hours', 'on_duty_hours', 'off_duty_hours']),
+        ]
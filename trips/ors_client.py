@@ -3,8 +3,92 @@ Route planning client supporting both OpenRouteService and Mapbox.
 """
 import requests
 import json
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from itertools import takewhile
+from math import atan2, cos, radians, sin, sqrt
 from typing import Dict, List, Tuple, Optional
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+RETRY_AFTER_MAX = 2.0  # Cap on a provider's Retry-After, in seconds
+
+
+class _BackoffRetry(Retry):
+    """
+    Retry that backs off from the first retry onwards and caps Retry-After.
+    
+    urllib3's Retry sleeps 0 s (jitter included) before the first retry, so a
+    single 429/5xx retry would re-send immediately. Here every retry waits
+    backoff_factor * 2**(n - 1) plus up to backoff_jitter seconds, and a
+    server's Retry-After is honoured up to RETRY_AFTER_MAX so it can't stall a
+    request thread.
+    """
+    
+    def get_backoff_time(self) -> float:
+        # Count only the latest run of consecutive errors (ignore redirects), as urllib3 does
+        consecutive_errors = len(list(
+            takewhile(lambda x: x.redirect_location is None, reversed(self.history))
+        ))
+        if consecutive_errors == 0:
+            return 0.0
+        backoff = self.backoff_factor * (2 ** (consecutive_errors - 1))
+        backoff += random.random() * self.backoff_jitter
+        return min(self.backoff_max, backoff)
+    
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, RETRY_AFTER_MAX)
+
+
+# Shared HTTP session so repeated calls reuse pooled keep-alive TLS connections
+# (one pool per host: api.mapbox.com and api.openrouteservice.org)
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    # Up to 2 retries of connection errors and 1 retry of a 429/5xx reply,
+    # each after a jittered backoff (0.5-0.8 s, then 1.0-1.3 s) or the
+    # provider's Retry-After capped at RETRY_AFTER_MAX. Read timeouts are not
+    # retried. POST is included since the ORS directions call is idempotent.
+    max_retries=_BackoffRetry(total=2, connect=2, read=0, status=1,
+                              backoff_factor=0.5, backoff_jitter=0.3,
+                              status_forcelist=[429, 500, 502, 503, 504],
+                              allowed_methods=['GET', 'POST'],
+                              respect_retry_after_header=True)
+))
+
+# (connect, read) timeouts: fail fast on connect so retries kick in quickly.
+# Worst case per provider is ~32 s: a connect timeout (3.05 s), backoff
+# (<= 0.8 s), a 5xx after a full read (13 s), a capped Retry-After (2 s) and a
+# last 13 s attempt. Read timeouts end the request without a retry.
+REQUEST_TIMEOUT = (3.05, 13)
+
+EARTH_RADIUS_MILES = 3959.0  # Mean Earth radius for haversine distances
+
+# Routes are cached per (current, pickup, dropoff), with each coordinate
+# quantized to 5 decimal places (~1 m) so near-identical requests share an entry.
+ROUTE_CACHE_SIZE = 4096
+ROUTE_CACHE_MAX_AGE = 3600  # Seconds before a cached route is refreshed in the background
+_COORD_SCALE = 1e5
+
+GEOMETRY_PRECISION = 6  # Decimal places kept in returned route coordinates (~11 cm)
+
+_route_cache = OrderedDict()  # key -> (fetched_at, route)
+_route_cache_lock = threading.Lock()
+_refreshing = set()
+
+# Circuit breaker for each routing provider (see _RouteProvider)
+PROVIDER_FAIL_MAX = 5
+PROVIDER_RESET_TIMEOUT = 30  # Seconds a failing provider is skipped
 
 
 def get_route(current: Tuple[float, float], pickup: Tuple[float, float], 
@@ -20,37 +104,177 @@ def get_route(current: Tuple[float, float], pickup: Tuple[float, float],
     Returns:
         Dict with distance (miles), duration (hours), and geometry
     """
-    print(f"🗺️  Route calculation requested for:")
-    print(f"   Current: {current}")
-    print(f"   Pickup: {pickup}")
-    print(f"   Dropoff: {dropoff}")
+    logger.debug("Route requested: current=%s pickup=%s dropoff=%s", current, pickup, dropoff)
+    
+    key = _route_key(current, pickup, dropoff)
+    with _route_cache_lock:
+        cached = _route_cache.get(key)
+        if cached is not None:
+            _route_cache.move_to_end(key)
+    
+    if cached is not None:
+        fetched_at, route = cached
+        logger.debug("Using cached route")
+        # Serve the stale route now and refresh it for later requests
+        if time.monotonic() - fetched_at > ROUTE_CACHE_MAX_AGE:
+            _refresh_in_background(key, current, pickup, dropoff)
+        return _copy_route(route)
+    
+    route = _fetch_route(current, pickup, dropoff)
+    if route is None:
+        # Final fallback to mock data (not cached, so real routes are retried)
+        logger.warning("Using mock route data (no API route available)")
+        return _get_mock_route(current, pickup, dropoff)
+    
+    _store_route(key, route)
+    return route
+
+
+def _fetch_route(current: Tuple[float, float], pickup: Tuple[float, float],
+                 dropoff: Tuple[float, float]) -> Optional[Dict]:
+    """Fetch a route from the first configured provider that produces one, or None."""
+    for provider in _PROVIDERS:
+        route = provider.fetch(current, pickup, dropoff)
+        if route is not None:
+            return route
+    return None
+
+
+class _ProviderUnavailable(Exception):
+    """A routing API could not be reached or failed server-side (timeout, 429 or 5xx)."""
+
+
+class _RouteProvider:
+    """
+    A routing API with a simple circuit breaker.
     
-    # Check API availability
-    mapbox_available = hasattr(settings, 'MAPBOX_ACCESS_TOKEN') and settings.MAPBOX_ACCESS_TOKEN
-    ors_available = hasattr(settings, 'ORS_API_KEY') and settings.ORS_API_KEY
+    After PROVIDER_FAIL_MAX consecutive outages (_ProviderUnavailable) the
+    provider is skipped for PROVIDER_RESET_TIMEOUT seconds, so an outage falls
+    straight through to the next provider instead of costing every request a
+    timeout and its retries. Rejected input (4xx) and "no route" replies mean
+    the provider is up, so they don't count.
+    """
     
-    print(f"🔑 API Status:")
-    print(f"   Mapbox: {'✅ Available' if mapbox_available else '❌ Not configured'}")
-    print(f"   ORS: {'✅ Available' if ors_available else '❌ Not configured'}")
+    def __init__(self, name: str, get_route_func):
+        self.name = name
+        self._get_route = get_route_func
+        self._lock = threading.Lock()  # Workers are threaded (gthread)
+        self._failures = 0
+        self._open_until = 0.0
+    
+    def fetch(self, current: Tuple[float, float], pickup: Tuple[float, float],
+              dropoff: Tuple[float, float]) -> Optional[Dict]:
+        with self._lock:
+            if self._open_until and time.monotonic() < self._open_until:
+                logger.debug("Skipping %s: circuit open", self.name)
+                return None
+        
+        logger.debug("Using %s", self.name)
+        try:
+            route = self._get_route(current, pickup, dropoff)
+        except _ProviderUnavailable:
+            with self._lock:
+                self._failures += 1
+                if self._failures >= PROVIDER_FAIL_MAX:
+                    logger.warning("%s failed %d times in a row; skipping it for %ds",
+                                   self.name, self._failures, PROVIDER_RESET_TIMEOUT)
+                    self._open_until = time.monotonic() + PROVIDER_RESET_TIMEOUT
+            return None
+        
+        with self._lock:
+            self._failures = 0
+            self._open_until = 0.0
+        return route
+
+
+def _is_outage(error: Exception) -> bool:
+    """Whether a request error means the provider itself is down, not that it rejected the input."""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status_code = error.response.status_code
+        return status_code == 429 or status_code >= 500
+    # Connection failures, timeouts and exhausted 429/5xx retries (RetryError)
+    return isinstance(error, requests.RequestException)
+
+
+def _route_key(current: Tuple[float, float], pickup: Tuple[float, float],
+               dropoff: Tuple[float, float]) -> Tuple:
+    """Build the cache key from coordinates quantized to integers."""
+    return tuple((round(lon * _COORD_SCALE), round(lat * _COORD_SCALE))
+                 for lon, lat in (current, pickup, dropoff))
+
+
+def _quantize_geometry(geometry: Dict) -> Dict:
+    """Round provider [lon, lat] points to GEOMETRY_PRECISION places to keep responses compact."""
+    return {
+        **geometry,
+        'coordinates': [[round(lon, GEOMETRY_PRECISION), round(lat, GEOMETRY_PRECISION)]
+                        for lon, lat, *_ in geometry['coordinates']]
+    }
+
+
+def _copy_route(route: Dict) -> Dict:
+    """Copy a cached route; its coordinates are immutable tuples and can be shared."""
+    return {**route, 'geometry': dict(route['geometry'])}
+
+
+def _store_route(key: Tuple, route: Dict) -> None:
+    """Cache a route, freezing its coordinates so callers can't mutate the cached copy."""
+    geometry = route['geometry']
+    frozen = {
+        **route,
+        'geometry': {**geometry, 'coordinates': tuple(map(tuple, geometry['coordinates']))}
+    }
+    with _route_cache_lock:
+        _route_cache[key] = (time.monotonic(), frozen)
+        _route_cache.move_to_end(key)
+        while len(_route_cache) > ROUTE_CACHE_SIZE:
+            _route_cache.popitem(last=False)
+
+
+def _refresh_in_background(key: Tuple, current: Tuple[float, float],
+                           pickup: Tuple[float, float], dropoff: Tuple[float, float]) -> None:
+    """Re-fetch a stale cached route on a daemon thread (at most one per key)."""
+    with _route_cache_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
     
-    # Try Mapbox first if API key is available
-    if mapbox_available:
-        print("🚀 Using Mapbox Directions API...")
-        return _get_mapbox_route(current, pickup, dropoff)
+    def _refresh():
+        try:
+            route = _fetch_route(current, pickup, dropoff)
+            if route is not None:
+                _store_route(key, route)
+        finally:
+            with _route_cache_lock:
+                _refreshing.discard(key)
     
-    # Fallback to OpenRouteService
-    if ors_available:
-        print("🚀 Using OpenRouteService API...")
-        return _get_ors_route(current, pickup, dropoff)
+    threading.Thread(target=_refresh, daemon=True).start()
+
+
+def _describe_error(error: Exception) -> str:
+    """
+    Summarize a provider failure for the logs.
     
-    # Final fallback to mock data
-    print("⚠️  Using mock data (no API keys configured)")
-    return _get_mock_route(current, pickup, dropoff)
+    requests puts the full URL, including Mapbox's access_token query
+    parameter, into HTTPError and RetryError messages, so for request errors
+    only the exception type and status code are reported.
+    """
+    if not isinstance(error, requests.RequestException):
+        return f"{type(error).__name__}: {error}"
+    response = error.response
+    if response is not None:
+        return f"{type(error).__name__} (HTTP {response.status_code})"
+    return type(error).__name__
 
 
 def _get_mapbox_route(current: Tuple[float, float], pickup: Tuple[float, float], 
-                     dropoff: Tuple[float, float]) -> Dict:
-    """Get route from Mapbox Directions API."""
+                     dropoff: Tuple[float, float]) -> Optional[Dict]:
+    """
+    Get route from Mapbox Directions API.
+    
+    Returns None if Mapbox rejects the request or finds no route; raises
+    _ProviderUnavailable if it is unreachable, rate limited or erroring.
+    """
     try:
         # Mapbox Directions API endpoint
         coordinates = f"{current[0]},{current[1]};{pickup[0]},{pickup[1]};{dropoff[0]},{dropoff[1]}"
@@ -63,17 +287,14 @@ def _get_mapbox_route(current: Tuple[float, float], pickup: Tuple[float, float],
             'steps': 'false'
         }
         
-        print(f"📡 Mapbox API Request:")
-        print(f"   URL: {url}")
-        print(f"   Token: {settings.MAPBOX_ACCESS_TOKEN[:10]}...")
+        logger.debug("Mapbox API request: %s", url)
         
-        response = requests.get(url, params=params, timeout=30)
-        print(f"📊 Response Status: {response.status_code}")
+        response = _session.get(url, params=params, timeout=REQUEST_TIMEOUT)
+        logger.debug("Mapbox response status: %s", response.status_code)
         
         response.raise_for_status()
         
         data = response.json()
-        print(f"📋 Response Data Keys: {list(data.keys())}")
         
         if 'routes' in data and len(data['routes']) > 0:
             route = data['routes'][0]
@@ -82,29 +303,33 @@ def _get_mapbox_route(current: Tuple[float, float], pickup: Tuple[float, float],
             distance_miles = route['distance'] * 0.000621371
             duration_hours = route['duration'] / 3600
             
-            print(f"✅ Mapbox Route Success:")
-            print(f"   Distance: {distance_miles:.2f} miles")
-            print(f"   Duration: {duration_hours:.2f} hours")
-            print(f"   Geometry points: {len(route['geometry']['coordinates'])}")
+            logger.debug("Mapbox route: %.2f miles, %.2f hours, %d geometry points",
+                         distance_miles, duration_hours, len(route['geometry']['coordinates']))
             
             return {
                 'distance': round(distance_miles, 2),
                 'duration': round(duration_hours, 2),
-                'geometry': route['geometry']
+                'geometry': _quantize_geometry(route['geometry'])
             }
         else:
-            print("No routes found in Mapbox response")
-            return _get_mock_route(current, pickup, dropoff)
+            logger.warning("No routes found in Mapbox response")
+            return None
             
     except Exception as e:
-        print(f"Mapbox API error: {e}")
-        print(f"   Error type: {type(e).__name__}")
-        return _get_mock_route(current, pickup, dropoff)
+        logger.warning("Mapbox API error: %s", _describe_error(e))
+        if _is_outage(e):
+            raise _ProviderUnavailable(_describe_error(e)) from e
+        return None
 
 
 def _get_ors_route(current: Tuple[float, float], pickup: Tuple[float, float], 
-                  dropoff: Tuple[float, float]) -> Dict:
-    """Get route from OpenRouteService API."""
+                  dropoff: Tuple[float, float]) -> Optional[Dict]:
+    """
+    Get route from OpenRouteService API.
+    
+    Returns None if ORS rejects the request or finds no route; raises
+    _ProviderUnavailable if it is unreachable, rate limited or erroring.
+    """
     try:
         # OpenRouteService API endpoint
         url = "https://api.openrouteservice.org/v2/directions/driving-car"
@@ -123,7 +348,7 @@ def _get_ors_route(current: Tuple[float, float], pickup: Tuple[float, float],
             "units": "mi"
         }
         
-        response = requests.post(url, json=body, headers=headers, timeout=30)
+        response = _session.post(url, json=body, headers=headers, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         
         data = response.json()
@@ -140,14 +365,16 @@ def _get_ors_route(current: Tuple[float, float], pickup: Tuple[float, float],
             return {
                 'distance': round(distance_miles, 2),
                 'duration': round(duration_hours, 2),
-                'geometry': geometry
+                'geometry': _quantize_geometry(geometry)
             }
         else:
-            return _get_mock_route(current, pickup, dropoff)
+            return None
             
     except Exception as e:
-        print(f"ORS API error: {e}")
-        return _get_mock_route(current, pickup, dropoff)
+        logger.warning("ORS API error: %s", _describe_error(e))
+        if _is_outage(e):
+            raise _ProviderUnavailable(_describe_error(e)) from e
+        return None
 
 
 def _get_mock_route(current: Tuple[float, float], pickup: Tuple[float, float], 
@@ -163,40 +390,67 @@ def _get_mock_route(current: Tuple[float, float], pickup: Tuple[float, float],
     }
     
     # Calculate realistic distance based on coordinates
-    import math
-    
-    def haversine_distance(coord1, coord2):
-        """Calculate distance between two coordinates in miles."""
-        lat1, lon1 = coord1[1], coord1[0]  # Note: coordinates are [lon, lat]
-        lat2, lon2 = coord2[1], coord2[0]
-        
-        R = 3959  # Earth's radius in miles
-        
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
-        
-        a = (math.sin(dlat/2) * math.sin(dlat/2) + 
-             math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * 
-             math.sin(dlon/2) * math.sin(dlon/2))
-        
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        return R * c
-    
-    # Calculate total distance
-    total_distance = 0
-    total_distance += haversine_distance(current, pickup)
-    total_distance += haversine_distance(pickup, dropoff)
+    total_distance = sum(polyline_distances(coordinates))
     
     # Estimate duration (assume 50 mph average speed)
     estimated_duration = total_distance / 50.0
     
-    print(f"📊 Mock Route Calculation:")
-    print(f"   Calculated Distance: {total_distance:.2f} miles")
-    print(f"   Estimated Duration: {estimated_duration:.2f} hours")
-    print(f"   ⚠️  Using mock data - configure MAPBOX_ACCESS_TOKEN for real routes")
+    logger.debug("Mock route: %.2f miles, %.2f hours (configure MAPBOX_ACCESS_TOKEN for real routes)",
+                 total_distance, estimated_duration)
     
     return {
         'distance': round(total_distance, 2),
         'duration': round(estimated_duration, 2),
         'geometry': geometry
     }
+
+
+def polyline_distances(coordinates: List) -> List[float]:
+    """
+    Great-circle (haversine) distance in miles between consecutive points.
+    
+    Args:
+        coordinates: Sequence of [longitude, latitude] points
+    
+    Returns:
+        List of len(coordinates) - 1 segment distances
+    """
+    distances = []
+    if not coordinates:
+        return distances
+    
+    lon1, lat1 = coordinates[0][0], coordinates[0][1]
+    cos_lat1 = cos(radians(lat1))
+    for point in coordinates[1:]:
+        lon2, lat2 = point[0], point[1]
+        cos_lat2 = cos(radians(lat2))
+        
+        dlat = radians(lat2 - lat1)
+        dlon = radians(lon2 - lon1)
+        
+        sin_dlat = sin(dlat / 2)
+        sin_dlon = sin(dlon / 2)
+        a = sin_dlat * sin_dlat + cos_lat1 * cos_lat2 * sin_dlon * sin_dlon
+        
+        c = 2 * atan2(sqrt(a), sqrt(1 - a))
+        distances.append(EARTH_RADIUS_MILES * c)
+        
+        # Each point's latitude cosine is reused as the next segment's start
+        lon1, lat1, cos_lat1 = lon2, lat2, cos_lat2
+    
+    return distances
+
+
+def _configured_providers() -> List[_RouteProvider]:
+    """Routing providers with credentials configured, in order of preference."""
+    providers = []
+    if getattr(settings, 'MAPBOX_ACCESS_TOKEN', None):
+        providers.append(_RouteProvider('Mapbox Directions API', _get_mapbox_route))
+    if getattr(settings, 'ORS_API_KEY', None):
+        providers.append(_RouteProvider('OpenRouteService API', _get_ors_route))
+    logger.debug("Routing providers configured: %s", [p.name for p in providers] or 'none')
+    return providers
+
+
+# Credentials are read from the environment at startup, so the chain is built once
+_PROVIDERS = _configured_providers()
@@ -10,6 +10,11 @@ class DriverSerializer(serializers.ModelSerializer):
 
 class DailyRodSerializer(serializers.ModelSerializer):
     driver_name = serializers.CharField(source='driver.name', read_only=True)
+    entries = serializers.JSONField(source='entries_rows', read_only=True)
+    # Hours are stored as floats but keep the API's two-place decimal strings
+    driving_hours = serializers.DecimalField(max_digits=4, decimal_places=2, read_only=True)
+    on_duty_hours = serializers.DecimalField(max_digits=4, decimal_places=2, read_only=True)
+    off_duty_hours = serializers.DecimalField(max_digits=4, decimal_places=2, read_only=True)
     
     class Meta:
         model = DailyRod
@@ -17,23 +22,46 @@ class DailyRodSerializer(serializers.ModelSerializer):
                  'on_duty_hours', 'off_duty_hours', 'entries', 'created_at', 'updated_at']
 
 
+class CoordinateField(serializers.Field):
+    """
+    A [longitude, latitude] pair, validated in a single pass.
+
+    Checked directly rather than as a ListField of FloatFields, which builds
+    and runs a child field per element on every request.
+    """
+    default_error_messages = {
+        'invalid': 'Expected a [longitude, latitude] pair of numbers.',
+        'overflow': 'Integer value too large to convert to float',
+        'out_of_range': 'Invalid {name} coordinates: longitude must be -180 to 180, '
+                        'latitude must be -90 to 90',
+    }
+
+    def to_internal_value(self, data):
+        if not isinstance(data, (list, tuple)) or len(data) != 2:
+            self.fail('invalid')
+        try:
+            lng, lat = float(data[0]), float(data[1])
+        except (TypeError, ValueError):
+            self.fail('invalid')
+        except OverflowError:
+            self.fail('overflow')
+        # NaN fails both comparisons, so it is rejected here too
+        if not (-180 <= lng <= 180 and -90 <= lat <= 90):
+            self.fail('out_of_range', name=self.field_name.replace('_', ' '))
+        return (lng, lat)
+
+    def to_representation(self, value):
+        return list(value)
+
+
 class TripPlanRequestSerializer(serializers.Serializer):
-    current_location = serializers.ListField(
-        child=serializers.FloatField(),
-        min_length=2,
-        max_length=2,
+    current_location = CoordinateField(
         help_text="[longitude, latitude] of current location"
     )
-    pickup = serializers.ListField(
-        child=serializers.FloatField(),
-        min_length=2,
-        max_length=2,
+    pickup = CoordinateField(
         help_text="[longitude, latitude] of pickup location"
     )
-    dropoff = serializers.ListField(
-        child=serializers.FloatField(),
-        min_length=2,
-        max_length=2,
+    dropoff = CoordinateField(
         help_text="[longitude, latitude] of dropoff location"
     )
     driver_id = serializers.IntegerField(required=False, allow_null=True)
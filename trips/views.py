@@ -1,13 +1,24 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
 from rest_framework import status
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from datetime import datetime, timedelta
 from .models import Driver, DailyRod
 from .serializers import TripPlanRequestSerializer, TripPlanResponseSerializer, DriverSerializer, DailyRodSerializer
-from .ors_client import get_route
+from .ors_client import get_route, polyline_distances
 from .hos import hos_scheduler
 import json
+import logging
+from bisect import bisect_left
+from itertools import accumulate
+
+logger = logging.getLogger(__name__)
+
+MAX_DRIVING_HOURS = 11.0  # FMCSA 11-hour driving limit
+FUEL_INTERVAL_MILES = 1000.0  # Fueling stop at least every 1,000 miles
 
 
 @api_view(['POST'])
@@ -33,145 +44,84 @@ def plan_trip(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     data = serializer.validated_data
-    current_location = tuple(data['current_location'])
-    pickup = tuple(data['pickup'])
-    dropoff = tuple(data['dropoff'])
+    current_location = data['current_location']
+    pickup = data['pickup']
+    dropoff = data['dropoff']
     driver_id = data.get('driver_id')
     current_cycle_used_hours = data.get('current_cycle_used_hours', 0.0)
     start_date = data.get('start_date')
     start_time = data.get('start_time')
     
-    # Validate coordinates are within reasonable bounds
-    def validate_coordinates(coord, name):
-        lng, lat = coord
-        if not (-180 <= lng <= 180 and -90 <= lat <= 90):
-            raise ValueError(f"Invalid {name} coordinates: longitude must be -180 to 180, latitude must be -90 to 90")
-        return coord
-    
-    try:
-        current_location = validate_coordinates(current_location, "current location")
-        pickup = validate_coordinates(pickup, "pickup")
-        dropoff = validate_coordinates(dropoff, "dropoff")
-    except ValueError as e:
-        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-    
     # Get route information
     route_data = get_route(current_location, pickup, dropoff)
     
     # Debug logging
-    print(f"🔍 Route Data Debug:")
-    print(f"   Distance: {route_data['distance']} miles")
-    print(f"   Duration: {route_data['duration']} hours")
-    print(f"   Has Geometry: {'Yes' if route_data.get('geometry') else 'No'}")
-    if route_data.get('geometry'):
-        coords = route_data['geometry'].get('coordinates', [])
-        print(f"   Geometry Points: {len(coords)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        geometry = route_data.get('geometry')
+        logger.debug("Route data: distance=%s mi, duration=%s h, geometry points=%s",
+                     route_data['distance'], route_data['duration'],
+                     len(geometry.get('coordinates', [])) if geometry else 'none')
     
     # Calculate weekly used hours if driver_id provided
     weekly_used = current_cycle_used_hours
     if driver_id:
-        try:
-            driver = Driver.objects.get(id=driver_id)
-            # Get last 8 days of records to calculate rolling hours
-            eight_days_ago = timezone.now().date() - timedelta(days=8)
-            recent_rods = DailyRod.objects.filter(
-                driver=driver,
-                date__gte=eight_days_ago
-            ).order_by('-date')
-            
-            # Sum up on_duty_hours from recent records
-            weekly_used = sum(float(rod.on_duty_hours) for rod in recent_rods)
-            
-        except Driver.DoesNotExist:
+        if not Driver.objects.filter(id=driver_id).exists():
             return Response(
                 {'error': 'Driver not found'}, 
                 status=status.HTTP_404_NOT_FOUND
             )
+        
+        # Sum on_duty_hours over the last 8 days of records in the database
+        eight_days_ago = timezone.now().date() - timedelta(days=8)
+        weekly_used = DailyRod.objects.filter(
+            driver_id=driver_id,
+            date__gte=eight_days_ago
+        ).aggregate(total=Sum('on_duty_hours'))['total'] or 0.0
     
     # Build trip segments with enhanced spatial analysis
-    segments = [
-        {
-            'type': 'on_duty',
-            'duration': 1.0,  # 1 hour for pickup
-            'location': 'Pickup Location',
-            'coordinates': pickup
-        }
-    ]
-    
     # For single-day trips: Property-carrying driver, 70hrs/8days, no adverse driving conditions
     # 1 hour for pickup and drop-off, fueling every 1,000 miles
-    max_driving_hours = 11.0  # FMCSA 11-hour driving limit
     total_drive_duration = route_data['duration']
     total_distance = route_data['distance']
+    route_coordinates = route_data['geometry']['coordinates']
     
-    # For multi-day trips, we'll break down long driving segments into FMCSA-compliant chunks
-    # No longer restricting to single-day trips
-    
-    # Break down long driving segments into FMCSA-compliant chunks
-    if total_drive_duration <= max_driving_hours:
-        # Single day trip - add driving segments with fueling stops every 1,000 miles
-        current_distance = 0
-        segment_number = 1
-        
-        while current_distance < total_distance:
-            # Calculate distance for this driving segment
-            remaining_distance = total_distance - current_distance
-            segment_distance = min(remaining_distance, 1000.0)  # Max 1,000 miles per segment
-            
-            # Calculate driving time for this segment (proportional to distance)
-            segment_drive_time = (segment_distance / total_distance) * total_drive_duration
-            
-            # Add driving segment
-            segments.append({
-                'type': 'drive',
-                'duration': segment_drive_time,
-                'location': f'Route Segment {segment_number} ({segment_distance:.1f} mi)',
-                'coordinates': route_data['geometry']['coordinates']
-            })
-            
-            current_distance += segment_distance
-            segment_number += 1
-            
-            # Add fueling stop if not the last segment
-            if current_distance < total_distance:
-                segments.append({
-                    'type': 'on_duty',
-                    'duration': 0.5,
-                    'location': 'Fueling Stop',
-                    'coordinates': None
-                })
+    # Break down long driving segments into FMCSA-compliant chunks of (hours, miles),
+    # separated by a stop: fueling on single-day trips, a 10-hour rest on multi-day trips
+    if total_drive_duration <= MAX_DRIVING_HOURS:
+        # Single day trip - fueling stops every 1,000 miles
+        full_legs, last_leg = divmod(total_distance, FUEL_INTERVAL_MILES)
+        leg_distances = [FUEL_INTERVAL_MILES] * int(full_legs) + ([last_leg] if last_leg else [])
+        # Driving time for each leg is proportional to distance
+        drive_chunks = [((leg_distance / total_distance) * total_drive_duration, leg_distance)
+                        for leg_distance in leg_distances]
+        stop = {'type': 'on_duty', 'duration': 0.5, 'location': 'Fueling Stop'}
     else:
-        # Multi-day trip - break into 11-hour driving chunks with 10-hour rest breaks
-        remaining_duration = total_drive_duration
-        segment_number = 1
-        
-        while remaining_duration > 0:
-            # Drive for up to 11 hours
-            drive_duration = min(remaining_duration, max_driving_hours)
-            segments.append({
-                'type': 'drive',
-                'duration': drive_duration,
-                'location': f'Route Segment {segment_number} ({route_data["distance"] * (drive_duration / total_drive_duration):.1f} mi)',
-                'coordinates': route_data['geometry']['coordinates']
-            })
-            
-            remaining_duration -= drive_duration
-            segment_number += 1
-            
-            # Add 10-hour rest break if more driving remains
-            if remaining_duration > 0:
-                segments.append({
-                    'type': 'off_duty',
-                    'duration': 10.0,  # 10-hour rest break
-                    'location': 'Rest Break (10 hours)',
-                    'coordinates': route_data['geometry']['coordinates']
-                })
+        # Multi-day trip - 11-hour driving chunks with 10-hour rest breaks
+        full_days, last_day = divmod(total_drive_duration, MAX_DRIVING_HOURS)
+        drive_durations = [MAX_DRIVING_HOURS] * int(full_days) + ([last_day] if last_day else [])
+        drive_chunks = [(drive_duration, total_distance * (drive_duration / total_drive_duration))
+                        for drive_duration in drive_durations]
+        stop = {'type': 'off_duty', 'duration': 10.0, 'location': 'Rest Break (10 hours)'}
     
+    # Pickup, drive chunks separated by stops, then dropoff. Segments carry only
+    # what hos_scheduler reads; stops are never mutated, so one dict is shared.
+    segments = [{
+        'type': 'on_duty',
+        'duration': 1.0,  # 1 hour for pickup
+        'location': 'Pickup Location'
+    }]
+    for segment_number, (drive_duration, drive_distance) in enumerate(drive_chunks, 1):
+        if segment_number > 1:
+            segments.append(stop)
+        segments.append({
+            'type': 'drive',
+            'duration': drive_duration,
+            'location': f'Route Segment {segment_number} ({drive_distance:.1f} mi)'
+        })
     segments.append({
         'type': 'on_duty',
         'duration': 1.0,  # 1 hour for dropoff
-        'location': 'Dropoff Location',
-        'coordinates': dropoff
+        'location': 'Dropoff Location'
     })
     
     # Determine start time
@@ -184,38 +134,28 @@ def plan_trip(request):
         start_datetime = timezone.now()
     
     # Schedule with HOS compliance
-    print(f"🚛 HOS Scheduler Input:")
-    print(f"   Start Time: {start_datetime}")
-    print(f"   Total Route Duration: {route_data['duration']} hours")
-    print(f"   Segments: {len(segments)} segments")
-    for i, segment in enumerate(segments):
-        print(f"     Segment {i+1}: {segment['type']} - {segment['duration']} hours - {segment['location']}")
-    print(f"   Weekly Used: {weekly_used}")
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug("HOS scheduler input: start=%s, route duration=%s h, %d segments, weekly used=%s",
+                     start_datetime, route_data['duration'], len(segments), weekly_used)
+        for i, segment in enumerate(segments):
+            logger.debug("  Segment %d: %s - %s hours - %s",
+                         i + 1, segment['type'], segment['duration'], segment['location'])
     
     daily_logs = hos_scheduler(start_datetime, segments, weekly_used)
     
-    print(f"📋 HOS Scheduler Output:")
-    for i, log in enumerate(daily_logs):
-        print(f"   Day {i+1}: {log['date']}")
-        print(f"     Driving: {log['totals']['driving_hours']} hrs")
-        print(f"     On Duty: {log['totals']['on_duty_hours']} hrs")
-        print(f"     Off Duty: {log['totals']['off_duty_hours']} hrs")
+    if debug:
+        for i, log in enumerate(daily_logs):
+            logger.debug("  Day %d: %s driving=%s on_duty=%s off_duty=%s hrs", i + 1, log['date'],
+                         log['totals']['driving_hours'], log['totals']['on_duty_hours'],
+                         log['totals']['off_duty_hours'])
     
     # If driver_id provided, persist the logs
     if driver_id:
-        for log in daily_logs:
-            DailyRod.objects.update_or_create(
-                driver=driver,
-                date=log['date'],
-                defaults={
-                    'driving_hours': log['totals']['driving_hours'],
-                    'on_duty_hours': log['totals']['on_duty_hours'],
-                    'off_duty_hours': log['totals']['off_duty_hours'],
-                    'entries': log['entries']
-                }
-            )
+        DailyRod.objects.upsert_logs(driver_id, daily_logs)
     
     # Prepare enhanced response with spatial analysis data
+    cumulative_miles = cumulative_route_miles(route_coordinates)
     response_data = {
         'route': {
             'distance': route_data['distance'],
@@ -237,14 +177,46 @@ def plan_trip(request):
             'violations': [],
             'warnings': []
         },
-        'rest_stops': calculate_rest_stops(route_data),
-        'route_segments': split_route_segments(route_data)
+        'rest_stops': calculate_rest_stops(route_data, cumulative_miles),
+        'route_segments': split_route_segments(route_data, cumulative_miles)
     }
     
-    return Response(response_data, status=status.HTTP_200_OK)
+    # Stream the (often several hundred KB) body so the first bytes go out
+    # before the route geometry and daily logs have been encoded
+    return StreamingHttpResponse(stream_json_object(response_data),
+                                 content_type='application/json',
+                                 status=status.HTTP_200_OK)
+
+
+def stream_json_object(data):
+    """
+    Render a dict as a JSON object one top-level member at a time.
+    
+    Each value is encoded by DRF's JSONRenderer, so the output matches what
+    Response would have rendered for the whole dict.
+    """
+    renderer = JSONRenderer()
+    yield b'{'
+    for index, (key, value) in enumerate(data.items()):
+        yield (b',' if index else b'') + renderer.render(key) + b':' + renderer.render(value)
+    yield b'}'
 
 
-def calculate_rest_stops(route_data):
+def cumulative_route_miles(coordinates):
+    """Distance in miles along the polyline from its first point to each point."""
+    return list(accumulate(polyline_distances(coordinates), initial=0.0))
+
+
+def _coord_index_at(cumulative_miles, distance_ratio):
+    """Index of the polyline point nearest to distance_ratio of its length."""
+    target = distance_ratio * cumulative_miles[-1]
+    index = min(bisect_left(cumulative_miles, target), len(cumulative_miles) - 1)
+    if index and target - cumulative_miles[index - 1] <= cumulative_miles[index] - target:
+        index -= 1
+    return index
+
+
+def calculate_rest_stops(route_data, cumulative_miles):
     """Calculate optimal rest stops along the route."""
     distance = route_data['distance']
     duration = route_data['duration']  # Already in hours
@@ -260,11 +232,10 @@ def calculate_rest_stops(route_data):
         distance_ratio = time_from_start / duration
         distance_from_start = distance_ratio * distance
         
-        # Find coordinates at this distance (simplified)
+        # Find coordinates at this distance along the route
         coordinates = route_data['geometry']['coordinates']
         if coordinates:
-            coord_index = min(int(distance_ratio * len(coordinates)), len(coordinates) - 1)
-            location = coordinates[coord_index]
+            location = coordinates[_coord_index_at(cumulative_miles, distance_ratio)]
             
             rest_stops.append({
                 'location': location,
@@ -276,27 +247,28 @@ def calculate_rest_stops(route_data):
     return rest_stops
 
 
-def split_route_segments(route_data):
-    """Split route into manageable segments for multi-day trips."""
+def split_route_segments(route_data, cumulative_miles):
+    """
+    Split route into manageable segments for multi-day trips.
+    
+    Segments reference the route geometry by inclusive index range
+    (coord_start_idx..coord_end_idx into route.geometry.coordinates)
+    rather than carrying a copy of the points.
+    """
     distance = route_data['distance']
     duration = route_data['duration']  # Already in hours
-    max_driving_hours = 11  # FMCSA limit
     
     segments = []
-    segments_needed = max(1, int(duration / max_driving_hours))
+    segments_needed = max(1, int(duration / MAX_DRIVING_HOURS))
     segment_distance = distance / segments_needed
     
-    coordinates = route_data['geometry']['coordinates']
-    
     for i in range(segments_needed):
         start_distance = i * segment_distance
         end_distance = min((i + 1) * segment_distance, distance)
         
         # Find coordinates for segment start and end
-        start_coord_index = int((start_distance / distance) * len(coordinates))
-        end_coord_index = int((end_distance / distance) * len(coordinates))
-        
-        segment_coords = coordinates[start_coord_index:end_coord_index + 1]
+        start_coord_index = _coord_index_at(cumulative_miles, start_distance / distance)
+        end_coord_index = _coord_index_at(cumulative_miles, end_distance / distance)
         
         segments.append({
             'segment_number': i + 1,
@@ -304,7 +276,8 @@ def split_route_segments(route_data):
             'end_distance': end_distance,
             'distance': end_distance - start_distance,
             'duration': (end_distance - start_distance) / distance * duration,
-            'coordinates': segment_coords
+            'coord_start_idx': start_coord_index,
+            'coord_end_idx': end_coord_index
         })
     
     return segments
@@ -323,7 +296,7 @@ def get_driver_logs(request, driver_id):
     """Get HOS logs for a specific driver."""
     try:
         driver = Driver.objects.get(id=driver_id)
-        logs = DailyRod.objects.filter(driver=driver).order_by('-date')
+        logs = DailyRod.objects.filter(driver=driver).select_related('driver').order_by('-date')
         serializer = DailyRodSerializer(logs, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
     except Driver.DoesNotExist: